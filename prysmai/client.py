@@ -15,82 +15,172 @@ Architecture:
 
 from __future__ import annotations
 
-import json
 import os
-from typing import Any, Dict, Optional
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
 
 import httpx
-import openai
 
-from prysmai.context import _prysm_ctx
+from prysmai.context import _current_context, _dumps, _encode_headers, has_active_context
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime: openai is heavy and only needed once a
+    # monitored client is actually built.
+    import openai
+
+
+_KEY_PREFIX = "sk-prysm-"
+_KEY_PREFIX_LEN = len(_KEY_PREFIX)
+
+# Upstream headers the proxy never lets forward_headers override.
+_RESERVED_FORWARD_HEADERS = frozenset({"content-type", "authorization"})
+
+# Pool sizing for the connection(s) to the Prysm proxy. With HTTP/2 many
+# concurrent requests multiplex over a single keep-alive connection.
+_DEFAULT_LIMITS = httpx.Limits(
+    max_keepalive_connections=32,
+    max_connections=100,
+    keepalive_expiry=90.0,
+)
+
+# Underlying sync transports shared by every client with the same pool
+# settings, so clients built per request still reuse warm connections to the
+# proxy. Async transports are not shared: their pools are bound to the event
+# loop they were first used on.
+_TRANSPORT_CACHE: Dict[Tuple[Any, ...], httpx.HTTPTransport] = {}
+_TRANSPORT_CACHE_LOCK = threading.Lock()
+
+
+def _shared_transport(http2: bool, limits: httpx.Limits) -> httpx.HTTPTransport:
+    """Get or create the process-wide transport for these pool settings."""
+    key = (
+        http2,
+        limits.max_connections,
+        limits.max_keepalive_connections,
+        limits.keepalive_expiry,
+    )
+    transport = _TRANSPORT_CACHE.get(key)
+    if transport is None:
+        with _TRANSPORT_CACHE_LOCK:
+            transport = _TRANSPORT_CACHE.get(key)
+            if transport is None:
+                transport = _TRANSPORT_CACHE[key] = httpx.HTTPTransport(
+                    retries=2, http2=http2, limits=limits
+                )
+    return transport
 
 
 # ─── Custom transport that injects Prysm headers ───
 
 
+def _static_prysm_headers(
+    upstream_api_key: Optional[str],
+    forward_headers_json: Optional[str],
+) -> Tuple[Tuple[bytes, bytes], ...]:
+    """
+    Encode the per-client headers (dynamic upstream key, forward headers)
+    once; they are fixed for the client's lifetime.
+    """
+    headers: Dict[str, str] = {}
+    if upstream_api_key:
+        headers["X-Prysm-Upstream-Key"] = upstream_api_key
+    if forward_headers_json:
+        headers["X-Prysm-Forward-Headers"] = forward_headers_json
+    return _encode_headers(headers)
+
+
+def _apply_context_headers(request: httpx.Request) -> None:
+    """
+    Inject the current Prysm context headers, if any context has been set.
+
+    The headers arrive as pre-encoded byte pairs, so httpx skips the
+    str-to-bytes normalization it would otherwise do per header.
+    """
+    if has_active_context():
+        context_headers = _current_context()._raw_headers
+        # update() builds a temporary Headers object even for an empty input.
+        if context_headers:
+            request.headers.update(context_headers)
+
+
+def _with_context_headers(
+    static_headers: Tuple[Tuple[bytes, bytes], ...],
+) -> Tuple[Tuple[bytes, bytes], ...]:
+    """Combine the static headers with the current context headers for one update()."""
+    if has_active_context():
+        return static_headers + _current_context()._raw_headers
+    return static_headers
+
+
 class _PrysmTransport(httpx.BaseTransport):
     """
     Wraps an httpx transport to inject Prysm context headers
     (X-Prysm-User-Id, X-Prysm-Session-Id, X-Prysm-Metadata)
-    and optional dynamic upstream key / forward headers
     into every outgoing request.
+
+    close() is intentionally not forwarded: the wrapped transport is shared
+    by every client with the same pool settings.
+    """
+
+    def __init__(self, wrapped: httpx.BaseTransport):
+        self._wrapped = wrapped
+        # Bound once so each request skips the attribute chain to the wrapped transport.
+        self._send = wrapped.handle_request
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_context_headers(request)
+        return self._send(request)
+
+
+class _PrysmStaticTransport(_PrysmTransport):
+    """
+    Prysm transport that also sends the dynamic upstream key and forward
+    headers. Only used when the client has either, so plain clients keep
+    the context-only path.
     """
 
     def __init__(
         self,
         wrapped: httpx.BaseTransport,
         upstream_api_key: Optional[str] = None,
-        forward_headers: Optional[Dict[str, str]] = None,
+        forward_headers_json: Optional[str] = None,
     ):
-        self._wrapped = wrapped
-        self._upstream_api_key = upstream_api_key
-        self._forward_headers = forward_headers
+        super().__init__(wrapped)
+        self._static_headers = _static_prysm_headers(upstream_api_key, forward_headers_json)
 
     def handle_request(self, request: httpx.Request) -> httpx.Response:
-        ctx = _prysm_ctx.get()
-        headers = ctx.to_headers()
-        for key, value in headers.items():
-            request.headers[key] = value
+        request.headers.update(_with_context_headers(self._static_headers))
+        return self._send(request)
 
-        # Inject dynamic upstream key
-        if self._upstream_api_key:
-            request.headers["X-Prysm-Upstream-Key"] = self._upstream_api_key
 
-        # Inject forward headers as JSON
-        if self._forward_headers:
-            request.headers["X-Prysm-Forward-Headers"] = json.dumps(self._forward_headers)
+class _PrysmAsyncTransport(httpx.AsyncBaseTransport):
+    """Async version of the Prysm header-injecting transport."""
 
-        return self._wrapped.handle_request(request)
+    def __init__(self, wrapped: httpx.AsyncBaseTransport):
+        self._wrapped = wrapped
+        self._send = wrapped.handle_async_request
 
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_context_headers(request)
+        return await self._send(request)
 
-class _PrysmAsyncTransport(httpx.AsyncBaseTransport):
-    """Async version of the Prysm header-injecting transport."""
+
+class _PrysmAsyncStaticTransport(_PrysmAsyncTransport):
+    """Async version of _PrysmStaticTransport."""
 
     def __init__(
         self,
         wrapped: httpx.AsyncBaseTransport,
         upstream_api_key: Optional[str] = None,
-        forward_headers: Optional[Dict[str, str]] = None,
+        forward_headers_json: Optional[str] = None,
     ):
-        self._wrapped = wrapped
-        self._upstream_api_key = upstream_api_key
-        self._forward_headers = forward_headers
+        super().__init__(wrapped)
+        self._static_headers = _static_prysm_headers(upstream_api_key, forward_headers_json)
 
     async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
-        ctx = _prysm_ctx.get()
-        headers = ctx.to_headers()
-        for key, value in headers.items():
-            request.headers[key] = value
-
-        # Inject dynamic upstream key
-        if self._upstream_api_key:
-            request.headers["X-Prysm-Upstream-Key"] = self._upstream_api_key
-
-        # Inject forward headers as JSON
-        if self._forward_headers:
-            request.headers["X-Prysm-Forward-Headers"] = json.dumps(self._forward_headers)
-
-        return await self._wrapped.handle_async_request(request)
+        request.headers.update(_with_context_headers(self._static_headers))
+        return await self._send(request)
 
 
 # ─── PrysmClient: the monitored OpenAI client ───
@@ -111,8 +201,29 @@ class PrysmClient:
             upstream_api_key=os.environ["AI_GATEWAY_TOKEN"],
             forward_headers={"X-Gitlab-Instance-Id": "..."},
         )
+
+    HTTP/2 is enabled by default so concurrent requests share one TLS
+    connection to the proxy. Pass http2=False to fall back to HTTP/1.1, or
+    limits=httpx.Limits(...) to tune the connection pool.
+
+    Pass transport= to send requests through your own httpx transport instead
+    (e.g. httpx.MockTransport in tests); Prysm headers are still injected on top.
+    It must match the client kind: an httpx.BaseTransport for openai(), an
+    httpx.AsyncBaseTransport for async_openai(). A mismatch raises TypeError.
     """
 
+    __slots__ = (
+        "prysm_key",
+        "base_url",
+        "timeout",
+        "upstream_api_key",
+        "forward_headers",
+        "_forward_headers_json",
+        "http2",
+        "limits",
+        "transport",
+    )
+
     def __init__(
         self,
         prysm_key: Optional[str] = None,
@@ -120,6 +231,9 @@ class PrysmClient:
         timeout: float = 120.0,
         upstream_api_key: Optional[str] = None,
         forward_headers: Optional[Dict[str, str]] = None,
+        http2: bool = True,
+        limits: Optional[httpx.Limits] = None,
+        transport: Optional[Union[httpx.BaseTransport, httpx.AsyncBaseTransport]] = None,
     ):
         self.prysm_key = prysm_key or os.environ.get("PRYSM_API_KEY", "")
         self.base_url = base_url or os.environ.get(
@@ -127,29 +241,56 @@ class PrysmClient:
         )
         self.timeout = timeout
         self.upstream_api_key = upstream_api_key
-        self.forward_headers = forward_headers
+        # Drop headers the proxy refuses to override and encode the rest once.
+        if forward_headers:
+            forward_headers = {
+                name: value
+                for name, value in forward_headers.items()
+                if name.lower() not in _RESERVED_FORWARD_HEADERS
+            }
+        self.forward_headers = forward_headers or None
+        self._forward_headers_json = _dumps(self.forward_headers) if self.forward_headers else None
+        self.http2 = http2
+        self.limits = limits or _DEFAULT_LIMITS
+        self.transport = transport
 
         if not self.prysm_key:
             raise ValueError(
                 "Prysm API key is required. Pass prysm_key= or set PRYSM_API_KEY env var."
             )
 
-        if not self.prysm_key.startswith("sk-prysm-"):
+        if self.prysm_key[:_KEY_PREFIX_LEN] != _KEY_PREFIX:
             raise ValueError(
                 f"Invalid Prysm API key format. Expected 'sk-prysm-...' but got '{self.prysm_key[:12]}...'"
             )
 
+    def _has_static_headers(self) -> bool:
+        """Whether requests need the upstream key or forward headers."""
+        return bool(self.upstream_api_key or self._forward_headers_json)
+
     def openai(self, **kwargs: Any) -> openai.OpenAI:
         """
         Create a sync OpenAI client routed through Prysm.
 
         Any extra kwargs are passed to openai.OpenAI().
         """
-        transport = _PrysmTransport(
-            httpx.HTTPTransport(retries=2),
-            upstream_api_key=self.upstream_api_key,
-            forward_headers=self.forward_headers,
-        )
+        import openai
+
+        if self.transport is not None and not isinstance(self.transport, httpx.BaseTransport):
+            raise TypeError(
+                "PrysmClient.openai() needs a sync httpx.BaseTransport, "
+                f"got {type(self.transport).__name__}"
+            )
+        wrapped = self.transport or _shared_transport(self.http2, self.limits)
+        transport: _PrysmTransport
+        if self._has_static_headers():
+            transport = _PrysmStaticTransport(
+                wrapped,
+                upstream_api_key=self.upstream_api_key,
+                forward_headers_json=self._forward_headers_json,
+            )
+        else:
+            transport = _PrysmTransport(wrapped)
 
         http_client = httpx.Client(
             transport=transport,
@@ -169,11 +310,25 @@ class PrysmClient:
 
         Any extra kwargs are passed to openai.AsyncOpenAI().
         """
-        transport = _PrysmAsyncTransport(
-            httpx.AsyncHTTPTransport(retries=2),
-            upstream_api_key=self.upstream_api_key,
-            forward_headers=self.forward_headers,
+        import openai
+
+        if self.transport is not None and not isinstance(self.transport, httpx.AsyncBaseTransport):
+            raise TypeError(
+                "PrysmClient.async_openai() needs an httpx.AsyncBaseTransport, "
+                f"got {type(self.transport).__name__}"
+            )
+        wrapped = self.transport or httpx.AsyncHTTPTransport(
+            retries=2, http2=self.http2, limits=self.limits
         )
+        transport: _PrysmAsyncTransport
+        if self._has_static_headers():
+            transport = _PrysmAsyncStaticTransport(
+                wrapped,
+                upstream_api_key=self.upstream_api_key,
+                forward_headers_json=self._forward_headers_json,
+            )
+        else:
+            transport = _PrysmAsyncTransport(wrapped)
 
         http_client = httpx.AsyncClient(
             transport=transport,
@@ -191,6 +346,37 @@ class PrysmClient:
 # ─── monitor(): the one-line integration ───
 
 
+# Monitored sync clients keyed on their resolved configuration, so repeated
+# monitor() calls reuse one httpx connection pool instead of rebuilding it.
+# Least recently used entries are evicted past _MONITOR_CACHE_SIZE, since
+# the key includes the upstream key and services may rotate through many.
+# Async clients are not cached: their pools are bound to the event loop
+# they were first used on.
+_MONITOR_CACHE_SIZE = 64
+_MONITOR_CACHE: OrderedDict[Tuple[Any, ...], openai.OpenAI] = OrderedDict()
+_MONITOR_CACHE_LOCK = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    """
+    Drop the shared transports and clients in a forked child.
+
+    Their sockets belong to the parent; reusing them would interleave two
+    processes' HTTP/2 frames on one connection. The locks are replaced too,
+    in case another thread held one at fork time.
+    """
+    global _TRANSPORT_CACHE_LOCK, _MONITOR_CACHE_LOCK
+
+    _TRANSPORT_CACHE.clear()
+    _MONITOR_CACHE.clear()
+    _TRANSPORT_CACHE_LOCK = threading.Lock()
+    _MONITOR_CACHE_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def monitor(
     client: openai.OpenAI | openai.AsyncOpenAI,
     prysm_key: Optional[str] = None,
@@ -198,6 +384,8 @@ def monitor(
     timeout: float = 120.0,
     upstream_api_key: Optional[str] = None,
     forward_headers: Optional[Dict[str, str]] = None,
+    cache: bool = True,
+    transport: Optional[Union[httpx.BaseTransport, httpx.AsyncBaseTransport]] = None,
 ) -> openai.OpenAI | openai.AsyncOpenAI:
     """
     Wrap an existing OpenAI client to route all traffic through Prysm.
@@ -216,9 +404,17 @@ def monitor(
         forward_headers: Custom headers to forward to the upstream provider. Merged into the upstream
             request. Cannot override Content-Type or Authorization. Useful for passing platform-specific
             headers (e.g., X-Gitlab-Instance-Id).
+        cache: Reuse the monitored sync client (and its connection pool) across calls with
+            the same configuration (default True). The cached client is shared; if it is
+            closed, the next call builds a fresh one. Pass cache=False to get a private
+            instance.
+        transport: httpx transport to send requests through instead of the default pooled
+            one (e.g. httpx.MockTransport in tests). Must be an httpx.BaseTransport for sync
+            clients and an httpx.AsyncBaseTransport for async ones, else TypeError is raised.
+            Clients with a custom transport are never cached.
 
     Returns:
-        A new OpenAI client instance routed through Prysm.
+        An OpenAI client instance routed through Prysm.
 
     Example:
         import openai
@@ -248,15 +444,36 @@ def monitor(
             },
         )
     """
+    import openai
+
     prysm = PrysmClient(
         prysm_key=prysm_key,
         base_url=base_url,
         timeout=timeout,
         upstream_api_key=upstream_api_key,
         forward_headers=forward_headers,
+        transport=transport,
     )
 
     if isinstance(client, openai.AsyncOpenAI):
         return prysm.async_openai()
-    else:
+
+    if not cache or transport is not None:
         return prysm.openai()
+
+    key = (
+        prysm.prysm_key,
+        prysm.base_url,
+        prysm.timeout,
+        prysm.upstream_api_key,
+        prysm._forward_headers_json,
+    )
+    with _MONITOR_CACHE_LOCK:
+        cached = _MONITOR_CACHE.get(key)
+        # A caller may have closed the shared client (e.g. `with monitor(...)`).
+        if cached is None or cached.is_closed():
+            cached = _MONITOR_CACHE[key] = prysm.openai()
+        _MONITOR_CACHE.move_to_end(key)
+        if len(_MONITOR_CACHE) > _MONITOR_CACHE_SIZE:
+            _MONITOR_CACHE.popitem(last=False)
+    return cached
@@ -19,22 +19,95 @@ Usage:
 from __future__ import annotations
 
 import json
+import sys
 import contextvars
-from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+else:
+    # Hand datetimes, dataclasses and str/int/dict/list subclasses back as
+    # errors, so the json fallback decides how (and whether) to encode them.
+    _ORJSON_OPTIONS = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_SUBCLASS
+    )
 
-@dataclass
-class PrysmContext:
-    """Holds metadata that gets attached to every proxied request."""
+
+def _dumps(obj: Any) -> str:
+    """
+    Serialize to canonical JSON for use as a header value.
+
+    Output is compact, ASCII-only and key-sorted whenever the keys can be
+    compared; mixed-type keys keep insertion order. orjson is used when
+    installed; anything it rejects (non-str keys, ints beyond 64 bits,
+    datetimes) goes through json instead. Plain JSON data encodes to the
+    same bytes either way, except floats that need an exponent or are not
+    finite. orjson also accepts types json rejects, such as UUID and Enum
+    values, so metadata meant to work everywhere should stick to plain JSON.
+    """
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(obj, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            # orjson has no ensure_ascii; fall back so header values stay ASCII.
+            if encoded.isascii():
+                return encoded.decode()
+    try:
+        return json.dumps(obj, separators=(",", ":"), sort_keys=True)
+    except TypeError:
+        # Keys of mixed types (e.g. 1 and "b") cannot be sorted; json still
+        # encodes them in insertion order, as it always has.
+        return json.dumps(obj, separators=(",", ":"))
+
+
+def _encode_headers(headers: Mapping[str, str]) -> Tuple[Tuple[bytes, bytes], ...]:
+    """
+    Pre-encode headers into the byte pairs httpx stores internally.
+
+    Values are ASCII-encoded as httpx does for str headers, so non-ASCII
+    values raise UnicodeEncodeError instead of going out as raw UTF-8.
+    """
+    return tuple((name.encode("ascii"), value.encode("ascii")) for name, value in headers.items())
+
+
+# dataclass(slots=True) is only available on Python 3.10+.
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+class _PrebuiltHeaders:
+    """Slots for the headers PrysmContext derives from its fields."""
+
+    __slots__ = ("headers", "_raw_headers")
+
+    headers: Mapping[str, str]
+    _raw_headers: Tuple[Tuple[bytes, bytes], ...]
+
+
+@dataclass(frozen=True, **_SLOTS)
+class PrysmContext(_PrebuiltHeaders):
+    """
+    Holds metadata that gets attached to every proxied request.
+
+    Instances are immutable: the Prysm headers are built once on construction
+    and reused for every request made under this context. They are derived
+    state rather than fields, so copies and pickles rebuild them.
+    """
 
     user_id: Optional[str] = None
     session_id: Optional[str] = None
     governance_session_id: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-    def to_headers(self) -> Dict[str, str]:
-        """Convert context to Prysm custom headers."""
+    def __post_init__(self) -> None:
         headers: Dict[str, str] = {}
         if self.user_id:
             headers["X-Prysm-User-Id"] = self.user_id
@@ -43,15 +116,58 @@ class PrysmContext:
         if self.governance_session_id:
             headers["X-Prysm-Governance-Session-Id"] = self.governance_session_id
         if self.metadata:
-            headers["X-Prysm-Metadata"] = json.dumps(self.metadata)
-        return headers
+            headers["X-Prysm-Metadata"] = _dumps(self.metadata)
+        object.__setattr__(self, "headers", MappingProxyType(headers))
+        object.__setattr__(self, "_raw_headers", _encode_headers(headers))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Rebuild through __init__ so copy/deepcopy/pickle never touch the
+        # mappingproxy, which cannot be pickled.
+        return (
+            type(self),
+            (self.user_id, self.session_id, self.governance_session_id, self.metadata),
+        )
+
+    def to_headers(self) -> Dict[str, str]:
+        """Convert context to Prysm custom headers."""
+        return dict(self.headers)
 
 
-# Context variable for async-safe per-request metadata
-_prysm_ctx: contextvars.ContextVar[PrysmContext] = contextvars.ContextVar(
-    "prysm_context", default=PrysmContext()
+# Context variable for async-safe per-request metadata. It is only set inside
+# `with prysm_context(...)` scopes; None means the process-wide context below
+# applies.
+_prysm_ctx: contextvars.ContextVar[Optional[PrysmContext]] = contextvars.ContextVar(
+    "prysm_context", default=None
 )
 
+# Shared empty context, also used by prysm_context.clear().
+_EMPTY_CTX = PrysmContext()
+
+# Context shared by every thread and task, replaced by prysm_context.set().
+_global_ctx = _EMPTY_CTX
+
+# Flipped on the first scope entry and never reset: a task may outlive the
+# scope it was spawned in and still carry its copied value, so "no scope is
+# active right now" is not enough to skip the ContextVar lookup.
+_scopes_used = False
+
+# Flipped the first time any context is set or scoped. Until then every
+# request would carry no context headers, so transports can skip them.
+_ctx_ever_set = False
+
+
+def has_active_context() -> bool:
+    """Return True once any Prysm context has been set in this process."""
+    return _ctx_ever_set
+
+
+def _current_context() -> PrysmContext:
+    """Return the scoped context if one is active, else the global context."""
+    if not _scopes_used:
+        return _global_ctx
+    ctx = _prysm_ctx.get()
+    return _global_ctx if ctx is None else ctx
+
 
 class _ContextManager:
     """
@@ -67,24 +183,46 @@ class _ContextManager:
         governance_session_id: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
-        """Set global context metadata for all subsequent requests."""
-        ctx = _prysm_ctx.get()
+        """
+        Set context metadata for all subsequent requests.
+
+        Outside a `with prysm_context(...)` block this updates the global
+        context; inside one it only updates the active scope.
+        """
+        global _global_ctx, _ctx_ever_set
+
+        changes: Dict[str, Any] = {}
         if user_id is not None:
-            ctx.user_id = user_id
+            changes["user_id"] = user_id
         if session_id is not None:
-            ctx.session_id = session_id
+            changes["session_id"] = session_id
         if governance_session_id is not None:
-            ctx.governance_session_id = governance_session_id
+            changes["governance_session_id"] = governance_session_id
         if metadata is not None:
-            ctx.metadata = metadata
+            # Copied so later edits to the caller's dict can't drift from
+            # the headers built from it.
+            changes["metadata"] = dict(metadata)
+        if not changes:
+            return
+        _ctx_ever_set = True
+
+        scoped = _prysm_ctx.get()
+        if scoped is None:
+            _global_ctx = replace(_global_ctx, **changes)
+        else:
+            _prysm_ctx.set(replace(scoped, **changes))
 
     def get(self) -> PrysmContext:
         """Get the current context."""
-        return _prysm_ctx.get()
+        return _current_context()
 
     def clear(self) -> None:
         """Reset context to defaults."""
-        _prysm_ctx.set(PrysmContext())
+        global _global_ctx
+
+        _global_ctx = _EMPTY_CTX
+        if _prysm_ctx.get() is not None:
+            _prysm_ctx.set(_EMPTY_CTX)
 
     def __call__(
         self,
@@ -105,6 +243,8 @@ class _ContextManager:
 class _ContextScope:
     """Scoped context manager that restores previous context on exit."""
 
+    __slots__ = ("_user_id", "_session_id", "_governance_session_id", "_metadata", "_token")
+
     def __init__(
         self,
         user_id: Optional[str] = None,
@@ -115,16 +255,28 @@ class _ContextScope:
         self._user_id = user_id
         self._session_id = session_id
         self._governance_session_id = governance_session_id
-        self._metadata = metadata
-        self._token: Optional[contextvars.Token[PrysmContext]] = None
+        self._metadata = dict(metadata) if metadata is not None else None
+        self._token: Optional[contextvars.Token[Optional[PrysmContext]]] = None
 
     def __enter__(self) -> PrysmContext:
-        old = _prysm_ctx.get()
+        global _scopes_used, _ctx_ever_set
+
+        _scopes_used = _ctx_ever_set = True
+        old = _current_context()
+        # Only copy when both sides contribute keys; otherwise reuse the
+        # existing dict by reference. A lazy ChainMap would not save the copy
+        # since the headers are serialized eagerly on construction.
+        if not self._metadata:
+            metadata = old.metadata
+        elif not old.metadata:
+            metadata = self._metadata
+        else:
+            metadata = {**old.metadata, **self._metadata}
         new_ctx = PrysmContext(
             user_id=self._user_id or old.user_id,
             session_id=self._session_id or old.session_id,
             governance_session_id=self._governance_session_id or old.governance_session_id,
-            metadata={**old.metadata, **(self._metadata or {})},
+            metadata=metadata,
         )
         self._token = _prysm_ctx.set(new_ctx)
         return new_ctx
@@ -4,13 +4,22 @@ Tests for prysm.client — monitor(), PrysmClient, and transport layers.
 
 import os
 import json
+import datetime
 import pytest
 import httpx
 import openai
 
 from prysmai import monitor, PrysmClient, __version__
-from prysmai.client import _PrysmTransport, _PrysmAsyncTransport
-from prysmai.context import prysm_context, PrysmContext, _prysm_ctx
+from prysmai.client import (
+    _MONITOR_CACHE,
+    _PrysmTransport,
+    _PrysmAsyncTransport,
+    _PrysmStaticTransport,
+    _PrysmAsyncStaticTransport,
+    _reset_after_fork,
+    _shared_transport,
+)
+from prysmai.context import prysm_context, PrysmContext, _prysm_ctx, has_active_context
 
 
 # ─── Fixtures ───
@@ -56,6 +65,28 @@ class TestPrysmClientInit:
         pc = PrysmClient(prysm_key=VALID_KEY, timeout=30.0)
         assert pc.timeout == 30.0
 
+    def test_http2_enabled_by_default(self):
+        pc = PrysmClient(prysm_key=VALID_KEY)
+        assert pc.http2 is True
+        assert pc.limits.max_keepalive_connections == 32
+
+    def test_http2_can_be_disabled(self):
+        limits = httpx.Limits(max_connections=5)
+        pc = PrysmClient(prysm_key=VALID_KEY, http2=False, limits=limits)
+        assert pc.http2 is False
+        assert pc.limits is limits
+
+    def test_forward_headers_drop_reserved(self):
+        pc = PrysmClient(
+            prysm_key=VALID_KEY,
+            forward_headers={
+                "Authorization": "Bearer x",
+                "content-type": "text/plain",
+                "X-Gitlab-Realm": "saas",
+            },
+        )
+        assert pc.forward_headers == {"X-Gitlab-Realm": "saas"}
+
     def test_missing_key_raises(self):
         with pytest.raises(ValueError, match="Prysm API key is required"):
             PrysmClient()
@@ -88,6 +119,37 @@ class TestPrysmClientOpenAI:
         client = pc.openai()
         assert str(client.base_url) == "http://localhost:3000/v1/"
 
+    def test_sync_clients_share_transport(self):
+        limits = httpx.Limits(max_connections=7)
+        assert _shared_transport(True, limits) is _shared_transport(True, limits)
+        assert _shared_transport(True, limits) is not _shared_transport(False, limits)
+
+        pc = PrysmClient(prysm_key=VALID_KEY, limits=limits)
+        first, second = pc.openai(), pc.openai()
+        shared = _shared_transport(True, limits)
+        assert first._client._transport._wrapped is shared
+        assert second._client._transport._wrapped is shared
+
+    def test_shared_state_reset_after_fork(self):
+        limits = httpx.Limits(max_connections=7)
+        before = _shared_transport(True, limits)
+        monitor(openai.OpenAI(api_key="sk-test"), prysm_key=VALID_KEY)
+        _reset_after_fork()
+        assert _MONITOR_CACHE == {}
+        assert _shared_transport(True, limits) is not before
+
+    def test_custom_transport_is_wrapped(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200))
+        pc = PrysmClient(prysm_key=VALID_KEY, transport=transport)
+        assert pc.openai()._client._transport._wrapped is transport
+        assert pc.async_openai()._client._transport._wrapped is transport
+
+    def test_custom_transport_kind_mismatch_raises(self):
+        with pytest.raises(TypeError, match="httpx.BaseTransport"):
+            PrysmClient(prysm_key=VALID_KEY, transport=httpx.AsyncHTTPTransport()).openai()
+        with pytest.raises(TypeError, match="httpx.AsyncBaseTransport"):
+            PrysmClient(prysm_key=VALID_KEY, transport=httpx.HTTPTransport()).async_openai()
+
     def test_returns_async_client(self):
         pc = PrysmClient(prysm_key=VALID_KEY)
         client = pc.async_openai()
@@ -126,6 +188,12 @@ class TestMonitor:
         assert type(sync_mon) is openai.OpenAI
         assert type(async_mon) is openai.AsyncOpenAI
 
+    def test_monitor_spec_mock_async_client(self):
+        from unittest.mock import MagicMock
+
+        monitored = monitor(MagicMock(spec=openai.AsyncOpenAI), prysm_key=VALID_KEY)
+        assert isinstance(monitored, openai.AsyncOpenAI)
+
     def test_monitor_custom_base_url(self):
         original = openai.OpenAI(api_key="sk-test")
         monitored = monitor(
@@ -141,6 +209,52 @@ class TestMonitor:
         monitored = monitor(original)
         assert monitored.api_key == VALID_KEY
 
+    def test_monitor_reuses_sync_client(self):
+        original = openai.OpenAI(api_key="sk-test")
+        first = monitor(original, prysm_key=VALID_KEY)
+        second = monitor(openai.OpenAI(api_key="sk-other"), prysm_key=VALID_KEY)
+        assert first is second
+
+    def test_monitor_cache_opt_out(self):
+        original = openai.OpenAI(api_key="sk-test")
+        first = monitor(original, prysm_key=VALID_KEY, cache=False)
+        second = monitor(original, prysm_key=VALID_KEY, cache=False)
+        assert first is not second
+
+    def test_monitor_cache_keyed_on_config(self):
+        original = openai.OpenAI(api_key="sk-test")
+        first = monitor(original, prysm_key=VALID_KEY)
+        second = monitor(original, prysm_key=VALID_KEY, upstream_api_key="sk-up")
+        assert first is not second
+
+    def test_monitor_replaces_closed_client(self):
+        with monitor(openai.OpenAI(api_key="sk-test"), prysm_key=VALID_KEY) as closed:
+            pass
+        fresh = monitor(openai.OpenAI(api_key="sk-test"), prysm_key=VALID_KEY)
+        assert fresh is not closed
+        assert not fresh.is_closed()
+
+    def test_monitor_cache_is_bounded(self, monkeypatch):
+        from prysmai import client as client_module
+
+        monkeypatch.setattr(client_module, "_MONITOR_CACHE_SIZE", 2)
+        original = openai.OpenAI(api_key="sk-test")
+        first = monitor(original, prysm_key=VALID_KEY, upstream_api_key="sk-up-1")
+        monitor(original, prysm_key=VALID_KEY, upstream_api_key="sk-up-2")
+        # Touch the first entry so the second one is least recently used.
+        assert monitor(original, prysm_key=VALID_KEY, upstream_api_key="sk-up-1") is first
+        monitor(original, prysm_key=VALID_KEY, upstream_api_key="sk-up-3")
+        assert len(client_module._MONITOR_CACHE) <= 2
+        assert monitor(original, prysm_key=VALID_KEY, upstream_api_key="sk-up-1") is first
+
+    def test_monitor_async_rejects_sync_transport(self):
+        with pytest.raises(TypeError, match="httpx.AsyncBaseTransport"):
+            monitor(
+                openai.AsyncOpenAI(api_key="sk-test"),
+                prysm_key=VALID_KEY,
+                transport=httpx.HTTPTransport(),
+            )
+
     def test_monitor_missing_key_raises(self):
         original = openai.OpenAI(api_key="sk-test")
         with pytest.raises(ValueError, match="Prysm API key is required"):
@@ -193,6 +307,61 @@ class TestContext:
         ctx = prysm_context.get()
         assert ctx.metadata == {"a": 1}
 
+    def test_set_is_visible_across_threads(self):
+        import threading
+
+        prysm_context.set(user_id="global_user")
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(prysm_context.get().user_id))
+        thread.start()
+        thread.join()
+        assert seen == ["global_user"]
+
+    def test_context_headers_prebuilt(self):
+        ctx = PrysmContext(user_id="u1")
+        assert ctx.headers == {"X-Prysm-User-Id": "u1"}
+        with pytest.raises(AttributeError):
+            ctx.user_id = "u2"
+
+    def test_context_owns_caller_metadata(self):
+        metadata = {"a": 1}
+        prysm_context.set(metadata=metadata)
+        scope = prysm_context(metadata=metadata)
+        metadata["b"] = 2
+        ctx = prysm_context.get()
+        assert ctx.metadata == {"a": 1}
+        assert ctx.headers["X-Prysm-Metadata"] == '{"a":1}'
+        with scope as scoped:
+            assert scoped.metadata == {"a": 1}
+            assert scoped.headers["X-Prysm-Metadata"] == '{"a":1}'
+
+    def test_context_copies_and_pickles(self):
+        import copy
+        import dataclasses
+        import pickle
+
+        ctx = PrysmContext(user_id="u1", metadata={"env": "test"})
+        assert [f.name for f in dataclasses.fields(ctx)] == [
+            "user_id",
+            "session_id",
+            "governance_session_id",
+            "metadata",
+        ]
+        assert dataclasses.asdict(ctx) == {
+            "user_id": "u1",
+            "session_id": None,
+            "governance_session_id": None,
+            "metadata": {"env": "test"},
+        }
+        for clone in (copy.deepcopy(ctx), pickle.loads(pickle.dumps(ctx))):
+            assert clone == ctx
+            assert clone.headers == ctx.headers
+
+    def test_context_rejects_non_ascii_header_values(self):
+        # Same as httpx for str header values: never send raw UTF-8 bytes.
+        with pytest.raises(UnicodeEncodeError):
+            PrysmContext(user_id="jos\u00e9")
+
     def test_context_to_headers_empty(self):
         ctx = PrysmContext()
         assert ctx.to_headers() == {}
@@ -208,6 +377,49 @@ class TestContext:
         assert headers["X-Prysm-Session-Id"] == "s1"
         assert json.loads(headers["X-Prysm-Metadata"]) == {"env": "test"}
 
+    def test_context_metadata_header_is_canonical(self):
+        ctx = PrysmContext(metadata={"b": 2, "a": 1})
+        assert ctx.headers["X-Prysm-Metadata"] == '{"a":1,"b":2}'
+
+    def test_context_mixed_metadata_keys_encode(self):
+        metadata = {1: "a", "b": 2}
+        ctx = PrysmContext(metadata=metadata)
+        assert ctx.headers["X-Prysm-Metadata"] == '{"1":"a","b":2}'
+        with prysm_context(metadata=metadata) as scoped:
+            assert scoped.headers["X-Prysm-Metadata"] == '{"1":"a","b":2}'
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            {"b": [1, {"d": None, "c": True}], "a": "x"},
+            {"name": "caf\u00e9"},
+            {"big": 2**70},
+            {1: "int keys"},
+            {1: "mixed", "a": "keys"},
+        ],
+        ids=["plain", "non_ascii", "big_int", "int_keys", "mixed_keys"],
+    )
+    def test_dumps_matches_json_fallback(self, monkeypatch, value):
+        """orjson and the json fallback both encode plain metadata, to the same bytes."""
+        pytest.importorskip("orjson")
+        from prysmai import context as context_module
+
+        with_orjson = context_module._dumps(value)
+        monkeypatch.setattr(context_module, "orjson", None)
+        assert context_module._dumps(value) == with_orjson
+        assert json.loads(with_orjson) == json.loads(json.dumps(value))
+
+    def test_dumps_rejects_datetimes_either_way(self, monkeypatch):
+        pytest.importorskip("orjson")
+        from prysmai import context as context_module
+
+        value = {"when": datetime.date(2024, 1, 1)}
+        with pytest.raises(TypeError):
+            context_module._dumps(value)
+        monkeypatch.setattr(context_module, "orjson", None)
+        with pytest.raises(TypeError):
+            context_module._dumps(value)
+
     def test_context_to_headers_partial(self):
         ctx = PrysmContext(user_id="u1")
         headers = ctx.to_headers()
@@ -238,6 +450,49 @@ class TestTransport:
         assert captured_headers.get("x-prysm-user-id") == "test_user"
         assert captured_headers.get("x-prysm-session-id") == "test_session"
 
+    def test_transport_skips_context_until_first_set(self, monkeypatch):
+        """Before any set() no context headers are added; after it they are."""
+        from prysmai import context as context_module
+
+        # Simulate a fresh process: nothing has ever been set or scoped.
+        monkeypatch.setattr(context_module, "_ctx_ever_set", False)
+        captured = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            captured.append(request.headers)
+            return httpx.Response(200, json={"ok": True})
+
+        transport = _PrysmTransport(httpx.MockTransport(handler))
+
+        assert not has_active_context()
+        transport.handle_request(httpx.Request("GET", "https://example.com/test"))
+        assert not any(name.startswith("x-prysm-") for name in captured[-1])
+
+        prysm_context.set(user_id="first_user")
+        assert has_active_context()
+        transport.handle_request(httpx.Request("GET", "https://example.com/test"))
+        assert captured[-1].get("x-prysm-user-id") == "first_user"
+
+    def test_sync_transport_injects_static_headers(self):
+        """Verify the upstream key and forward headers are sent on every request."""
+        captured_headers = {}
+
+        class MockTransport(httpx.BaseTransport):
+            def handle_request(self, request: httpx.Request) -> httpx.Response:
+                captured_headers.update(dict(request.headers))
+                return httpx.Response(200, json={"ok": True})
+
+        transport = _PrysmStaticTransport(
+            MockTransport(),
+            upstream_api_key="sk-upstream",
+            forward_headers_json='{"X-Gitlab-Realm":"saas"}',
+        )
+        request = httpx.Request("GET", "https://example.com/test")
+        transport.handle_request(request)
+
+        assert captured_headers.get("x-prysm-upstream-key") == "sk-upstream"
+        assert json.loads(captured_headers["x-prysm-forward-headers"]) == {"X-Gitlab-Realm": "saas"}
+
     @pytest.mark.asyncio
     async def test_async_transport_injects_headers(self):
         """Verify the async transport adds context headers to requests."""
@@ -256,6 +511,38 @@ class TestTransport:
 
         assert captured_headers.get("x-prysm-user-id") == "async_user"
 
+    @pytest.mark.asyncio
+    async def test_async_transport_injects_static_headers(self):
+        """Verify the async transport sends the upstream key and forward headers."""
+        prysm_context.set(user_id="async_user")
+
+        captured_headers = {}
+
+        class MockAsyncTransport(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+                captured_headers.update(dict(request.headers))
+                return httpx.Response(200, json={"ok": True})
+
+        transport = _PrysmAsyncStaticTransport(
+            MockAsyncTransport(),
+            upstream_api_key="sk-upstream",
+            forward_headers_json='{"X-Gitlab-Realm":"saas"}',
+        )
+        request = httpx.Request("GET", "https://example.com/test")
+        await transport.handle_async_request(request)
+
+        assert captured_headers.get("x-prysm-upstream-key") == "sk-upstream"
+        assert json.loads(captured_headers["x-prysm-forward-headers"]) == {"X-Gitlab-Realm": "saas"}
+        assert captured_headers.get("x-prysm-user-id") == "async_user"
+
+    def test_client_picks_transport_for_static_headers(self):
+        plain = PrysmClient(prysm_key=VALID_KEY)
+        keyed = PrysmClient(prysm_key=VALID_KEY, upstream_api_key="sk-upstream")
+        assert type(plain.openai()._client._transport) is _PrysmTransport
+        assert type(keyed.openai()._client._transport) is _PrysmStaticTransport
+        assert type(plain.async_openai()._client._transport) is _PrysmAsyncTransport
+        assert type(keyed.async_openai()._client._transport) is _PrysmAsyncStaticTransport
+
 
 # ─── Version ───
 
@@ -1,16 +1,18 @@
 """
 Integration tests — verify the SDK works end-to-end against a mock HTTP server.
 
-These tests spin up a real httpx mock to simulate the Prysm proxy and verify
-that requests are correctly routed, headers are injected, and responses are
-properly returned.
+These tests simulate the Prysm proxy with an httpx.MockTransport passed to
+the SDK as its base transport, so every request still goes through Prysm's
+header-injecting transport. They verify that requests are correctly routed,
+headers are injected, and responses are properly returned.
 """
 
+import asyncio
 import json
 import pytest
+import pytest_asyncio
 import httpx
-import respx
-import openai
+from types import SimpleNamespace
 
 from prysmai import monitor, PrysmClient
 from prysmai.context import prysm_context
@@ -20,13 +22,6 @@ VALID_KEY = "sk-prysm-integration-test-key"
 MOCK_BASE = "http://mock-prysm.local/v1"
 
 
-@pytest.fixture(autouse=True)
-def clean_context():
-    prysm_context.clear()
-    yield
-    prysm_context.clear()
-
-
 # ─── Mock response payloads ───
 
 CHAT_COMPLETION_RESPONSE = {
@@ -52,231 +47,251 @@ CHAT_COMPLETION_RESPONSE = {
 }
 
 
-# ─── Sync integration tests ───
+AUTH_ERROR_RESPONSE = {
+    "error": {
+        "message": "Invalid API key",
+        "type": "authentication_error",
+        "code": "invalid_api_key",
+    }
+}
 
+SERVER_ERROR_RESPONSE = {
+    "error": {
+        "message": "Internal server error",
+        "type": "server_error",
+        "code": "internal_error",
+    }
+}
 
-class TestSyncIntegration:
-    @respx.mock
-    def test_chat_completion_routed_through_proxy(self):
-        """Full sync flow: monitor → create → response."""
-        route = respx.post(f"{MOCK_BASE}/chat/completions").mock(
-            return_value=httpx.Response(200, json=CHAT_COMPLETION_RESPONSE)
-        )
+# Metadata headers are canonical JSON (compact, sorted keys), so compare bytes-for-bytes.
+_EXPECTED_METADATA_HEADER = json.dumps({"env": "test"}, separators=(",", ":"), sort_keys=True)
 
-        original = openai.OpenAI(api_key="sk-original-key")
-        monitored = monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE)
+# Tests pick a non-200 reply by sending this header with the request.
+MOCK_STATUS_HEADER = "X-Mock-Status"
 
-        response = monitored.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": "Hello!"}],
-        )
+# Bodies are encoded once at import; each mocked reply just wraps the bytes.
+_BODIES = {
+    200: json.dumps(CHAT_COMPLETION_RESPONSE).encode(),
+    401: json.dumps(AUTH_ERROR_RESPONSE).encode(),
+    500: json.dumps(SERVER_ERROR_RESPONSE).encode(),
+}
+_JSON_HEADERS = [(b"content-type", b"application/json")]
 
-        assert route.called
-        assert response.choices[0].message.content == "Hello! How can I help you today?"
-        assert response.usage.total_tokens == 18
 
-    @respx.mock
-    def test_prysm_key_sent_as_bearer(self):
-        """Verify the Prysm API key is sent as Authorization: Bearer."""
-        captured = {}
+# Headers of every request that reached the mocked proxy, oldest first.
+_captured = []
 
-        def capture_request(request):
-            captured["auth"] = request.headers.get("authorization")
-            return httpx.Response(200, json=CHAT_COMPLETION_RESPONSE)
 
-        respx.post(f"{MOCK_BASE}/chat/completions").mock(side_effect=capture_request)
+def _capture(request):
+    _captured.append({
+        "url": str(request.url),
+        "auth": request.headers.get("authorization"),
+        "user_id": request.headers.get("x-prysm-user-id"),
+        "session_id": request.headers.get("x-prysm-session-id"),
+        "metadata": request.headers.get("x-prysm-metadata"),
+        "content": json.loads(request.content)["messages"][-1]["content"],
+    })
 
-        original = openai.OpenAI(api_key="sk-original")
-        monitored = monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE)
 
-        monitored.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": "test"}],
-        )
+def _handler(request):
+    if request.url.path != "/v1/chat/completions":
+        return httpx.Response(404)
+    _capture(request)
+    status = int(request.headers.get(MOCK_STATUS_HEADER, 200))
+    return httpx.Response(status, content=_BODIES[status], headers=_JSON_HEADERS)
+
+
+# MockTransport serves both sync and async clients.
+_TRANSPORT = httpx.MockTransport(_handler)
+
+
+# ─── Fixtures ───
 
-        assert captured["auth"] == f"Bearer {VALID_KEY}"
 
-    @respx.mock
-    def test_context_headers_injected(self):
-        """Verify context headers are injected into the request."""
-        captured = {}
+@pytest.fixture(scope="module")
+def openai_mod():
+    """openai, imported on first use so collecting this module stays cheap."""
+    import openai
 
-        def capture_request(request):
-            captured["user_id"] = request.headers.get("x-prysm-user-id")
-            captured["session_id"] = request.headers.get("x-prysm-session-id")
-            captured["metadata"] = request.headers.get("x-prysm-metadata")
-            return httpx.Response(200, json=CHAT_COMPLETION_RESPONSE)
+    return openai
+
+
+@pytest.fixture(scope="module")
+def http_client():
+    """Mock-backed httpx client for the original OpenAI clients.
+
+    monitor() discards the original client's HTTP stack, so sharing one here
+    just saves building a default httpx client (and its SSL context) per client.
+    """
+    with httpx.Client(transport=_TRANSPORT) as client:
+        yield client
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def async_http_client():
+    """Async counterpart of http_client, closed on the async tests' module loop."""
+    async with httpx.AsyncClient(transport=_TRANSPORT) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def monitored_sync(openai_mod, http_client):
+    """One monitored OpenAI client; context is read per request, so it can be shared.
+
+    ``create`` is bound once here; the transport still reads the context at send time.
+    """
+    original = openai_mod.OpenAI(api_key="sk-original", http_client=http_client)
+    monitored = monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE, transport=_TRANSPORT)
+    return SimpleNamespace(client=monitored, create=monitored.chat.completions.create)
+
+
+@pytest.fixture(scope="module")
+def prysm_client():
+    return PrysmClient(prysm_key=VALID_KEY, base_url=MOCK_BASE, transport=_TRANSPORT)
+
+
+@pytest.fixture(scope="module")
+def prysm_openai(prysm_client):
+    """The client from PrysmClient.openai(), built once and reused across tests."""
+    return prysm_client.openai()
+
+
+@pytest.fixture(scope="module")
+def monitored_async(openai_mod, async_http_client):
+    """One monitored AsyncOpenAI client shared by the async tests' event loop."""
+    original = openai_mod.AsyncOpenAI(api_key="sk-original", http_client=async_http_client)
+    return monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE, transport=_TRANSPORT)
+
+
+@pytest.fixture(autouse=True)
+def reset_captured():
+    _captured.clear()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def clean_module_context():
+    """Start the module from an empty context, whatever earlier modules left behind."""
+    prysm_context.clear()
+
+
+@pytest.fixture(autouse=True)
+def clean_context():
+    # Each test leaves an empty context for the next, so one reset per test is enough.
+    yield
+    prysm_context.clear()
 
-        respx.post(f"{MOCK_BASE}/chat/completions").mock(side_effect=capture_request)
 
+# ─── Sync integration tests ───
+
+
+class TestSyncIntegration:
+    def test_sync_happy_path_covers_routing_auth_and_context(self, monitored_sync):
+        """Full sync flow: monitor → create → response, checked from one request."""
         prysm_context.set(
             user_id="user_42",
             session_id="sess_abc",
             metadata={"env": "test"},
         )
 
-        original = openai.OpenAI(api_key="sk-original")
-        monitored = monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE)
-
-        monitored.chat.completions.create(
+        response = monitored_sync.create(
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": "test"}],
+            messages=[{"role": "user", "content": "Hello!"}],
         )
 
+        # Routed through the proxy
+        assert len(_captured) == 1
+        captured = _captured[0]
+        assert captured["url"] == f"{MOCK_BASE}/chat/completions"
+
+        # Prysm API key sent as Authorization: Bearer
+        assert captured["auth"] == f"Bearer {VALID_KEY}"
+
+        # Context headers injected
         assert captured["user_id"] == "user_42"
         assert captured["session_id"] == "sess_abc"
-        assert json.loads(captured["metadata"]) == {"env": "test"}
-
-    @respx.mock
-    def test_prysm_client_direct(self):
-        """Test PrysmClient.openai() directly."""
-        respx.post(f"{MOCK_BASE}/chat/completions").mock(
-            return_value=httpx.Response(200, json=CHAT_COMPLETION_RESPONSE)
-        )
+        assert captured["metadata"] == _EXPECTED_METADATA_HEADER
 
-        pc = PrysmClient(prysm_key=VALID_KEY, base_url=MOCK_BASE)
-        client = pc.openai()
+        # Response passed back intact
+        assert response.choices[0].message.content == "Hello! How can I help you today?"
+        assert response.usage.total_tokens == 18
 
-        response = client.chat.completions.create(
+    def test_prysm_client_direct(self, prysm_openai):
+        """Test PrysmClient.openai() directly."""
+        response = prysm_openai.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "test"}],
         )
 
         assert response.id == "chatcmpl-test123"
 
-    @respx.mock
-    def test_scoped_context_changes(self):
-        """Verify scoped context is used within the with-block."""
-        captured_calls = []
-
-        def capture_request(request):
-            captured_calls.append({
-                "user_id": request.headers.get("x-prysm-user-id"),
-            })
-            return httpx.Response(200, json=CHAT_COMPLETION_RESPONSE)
-
-        respx.post(f"{MOCK_BASE}/chat/completions").mock(side_effect=capture_request)
-
-        prysm_context.set(user_id="global_user")
-
-        pc = PrysmClient(prysm_key=VALID_KEY, base_url=MOCK_BASE)
-        client = pc.openai()
-
-        # First call with global context
-        client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": "call 1"}],
-        )
-
-        # Second call with scoped context
-        with prysm_context(user_id="scoped_user"):
-            client2 = pc.openai()
-            client2.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": "call 2"}],
-            )
-
-        assert captured_calls[0]["user_id"] == "global_user"
-        assert captured_calls[1]["user_id"] == "scoped_user"
-
 
 # ─── Async integration tests ───
 
 
 class TestAsyncIntegration:
-    @respx.mock
-    @pytest.mark.asyncio
-    async def test_async_chat_completion(self):
-        """Full async flow: monitor → create → response."""
-        respx.post(f"{MOCK_BASE}/chat/completions").mock(
-            return_value=httpx.Response(200, json=CHAT_COMPLETION_RESPONSE)
-        )
-
-        original = openai.AsyncOpenAI(api_key="sk-original")
-        monitored = monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE)
+    # The async tests share one module-scoped loop, matching the shared client.
+    pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-        response = await monitored.chat.completions.create(
+    async def test_async_chat_completion(self, monitored_async):
+        """Full async flow: monitor → create → response."""
+        response = await monitored_async.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "Hello async!"}],
         )
 
         assert response.choices[0].message.content == "Hello! How can I help you today?"
 
-    @respx.mock
-    @pytest.mark.asyncio
-    async def test_async_context_headers(self):
+    async def test_async_context_headers(self, monitored_async):
         """Verify context headers work in async mode."""
-        captured = {}
-
-        def capture_request(request):
-            captured["user_id"] = request.headers.get("x-prysm-user-id")
-            return httpx.Response(200, json=CHAT_COMPLETION_RESPONSE)
-
-        respx.post(f"{MOCK_BASE}/chat/completions").mock(side_effect=capture_request)
-
         prysm_context.set(user_id="async_user_99")
 
-        original = openai.AsyncOpenAI(api_key="sk-original")
-        monitored = monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE)
-
-        await monitored.chat.completions.create(
+        await monitored_async.chat.completions.create(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": "test"}],
         )
 
-        assert captured["user_id"] == "async_user_99"
+        assert _captured[-1]["user_id"] == "async_user_99"
 
+    async def test_scoped_context_changes(self, monitored_async):
+        """Verify a scope only tags requests made inside it, even when run concurrently."""
+        prysm_context.set(user_id="global_user")
 
-# ─── Error handling ───
+        async def create(content):
+            await monitored_async.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": content}],
+            )
 
+        async def create_scoped(content):
+            with prysm_context(user_id="scoped_user"):
+                await create(content)
 
-class TestErrorHandling:
-    @respx.mock
-    def test_proxy_401_raises(self):
-        """Verify that a 401 from the proxy surfaces as an auth error."""
-        respx.post(f"{MOCK_BASE}/chat/completions").mock(
-            return_value=httpx.Response(
-                401,
-                json={
-                    "error": {
-                        "message": "Invalid API key",
-                        "type": "authentication_error",
-                        "code": "invalid_api_key",
-                    }
-                },
-            )
-        )
+        # gather() runs each call in its own task with a copy of the context,
+        # so the scope must not leak into the concurrent unscoped call.
+        await asyncio.gather(create("call 1"), create_scoped("call 2"))
 
-        original = openai.OpenAI(api_key="sk-original")
-        monitored = monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE)
+        by_content = {call["content"]: call for call in _captured}
+        assert by_content["call 1"]["user_id"] == "global_user"
+        assert by_content["call 2"]["user_id"] == "scoped_user"
 
-        with pytest.raises(openai.AuthenticationError):
-            monitored.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": "test"}],
-            )
 
-    @respx.mock
-    def test_proxy_500_raises(self):
-        """Verify that a 500 from the proxy surfaces as an API error."""
-        respx.post(f"{MOCK_BASE}/chat/completions").mock(
-            return_value=httpx.Response(
-                500,
-                json={
-                    "error": {
-                        "message": "Internal server error",
-                        "type": "server_error",
-                        "code": "internal_error",
-                    }
-                },
-            )
-        )
+# ─── Error handling ───
 
-        original = openai.OpenAI(api_key="sk-original")
-        monitored = monitor(original, prysm_key=VALID_KEY, base_url=MOCK_BASE)
 
-        with pytest.raises(openai.InternalServerError):
-            monitored.chat.completions.create(
+class TestErrorHandling:
+    @pytest.mark.parametrize(
+        "status, exc_name",
+        [
+            (401, "AuthenticationError"),
+            (500, "InternalServerError"),
+        ],
+        ids=["auth_error", "server_error"],
+    )
+    def test_proxy_error_raises(self, openai_mod, monitored_sync, status, exc_name):
+        """Verify that proxy errors surface as the matching OpenAI exception."""
+        with pytest.raises(getattr(openai_mod, exc_name)):
+            monitored_sync.create(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": "test"}],
+                extra_headers={MOCK_STATUS_HEADER: str(status)},
             )